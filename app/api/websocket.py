@@ -1,8 +1,9 @@
 import asyncio
 import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Set
+from typing import List, Set
 from app.core.task_queue import task_queue
+from app.core.metrics import WEBSOCKET_BROADCAST_SECONDS, WEBSOCKET_CONNECTIONS
 
 
 router = APIRouter()
@@ -18,20 +19,23 @@ class ConnectionManager:
         """Accept and store new WebSocket connection"""
         await websocket.accept()
         self.active_connections.add(websocket)
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
     
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
         self.active_connections.discard(websocket)
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
     
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
         disconnected = set()
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
+        with WEBSOCKET_BROADCAST_SECONDS.time():
+            for connection in self.active_connections:
+                try:
+                    await connection.send_json(message)
+                except Exception:
+                    disconnected.add(connection)
         
         # Clean up disconnected clients
         for connection in disconnected:
@@ -96,3 +100,15 @@ async def broadcast_stats():
         "stats": stats
     })
 
+
+async def broadcast_tasks_update(task_ids: List[str]):
+    """Broadcast updates for several tasks, fetching stats only once"""
+    tasks = await task_queue.get_tasks(task_ids)
+    stats = await task_queue.get_stats()
+    
+    for task in tasks:
+        await manager.broadcast({
+            "type": "task_update",
+            "task": json.loads(task.model_dump_json()),
+            "stats": stats
+        })
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
+from app.models.task import TaskType
 
 
 class Settings(BaseSettings):
@@ -20,6 +21,25 @@ class Settings(BaseSettings):
     max_retries: int = 3
     task_timeout: int = 300
     
+    # Batch Settings
+    batch_task_types: List[TaskType] = []
+    batch_size: int = 100
+    batch_wait_ms: int = 50
+    
+    # Autoscaling Settings
+    autoscale: bool = False
+    min_workers: int = 1
+    max_workers: int = 16
+    autoscale_interval: float = 2.0
+    autoscale_target_wait_ms: int = 1000
+    autoscale_max_loop_lag_ms: int = 100
+    autoscale_max_redis_latency_ms: int = 50
+    autoscale_max_cpu: float = 0.9
+    
+    # Metrics Settings
+    worker_metrics_port: int = 0
+    metrics_refresh_interval: int = 5
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,156 @@
+import bisect
+import functools
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from prometheus_client import REGISTRY, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+
+
+# Task Metrics
+QUEUE_WAIT_SECONDS = Histogram(
+    "taskqueue_queue_wait_seconds",
+    "Time from task creation until a worker starts it (first attempt only)",
+    ["task_type"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+)
+TASK_EXECUTION_SECONDS = Histogram(
+    "taskqueue_task_execution_seconds",
+    "Handler execution time per task (batched tasks report their share of the batch)",
+    ["task_type"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+)
+
+# Redis Metrics
+REDIS_METHOD_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+class MethodStats:
+    """Latency histogram and round-trip count of one TaskQueue method"""
+    
+    __slots__ = ("buckets", "total_seconds", "round_trips")
+    
+    def __init__(self):
+        self.buckets = [0] * (len(REDIS_METHOD_BUCKETS) + 1)
+        self.total_seconds = 0.0
+        self.round_trips = 0
+    
+    def observe(self, seconds: float, round_trips: int):
+        self.buckets[bisect.bisect_left(REDIS_METHOD_BUCKETS, seconds)] += 1
+        self.total_seconds += seconds
+        self.round_trips += round_trips
+
+
+class RedisMethodCollector:
+    """
+    Exposes TaskQueue method stats as Prometheus metrics
+    
+    Stats are plain counters updated on the event loop and only converted at scrape
+    time, which avoids the per-observation locking of Histogram and Counter on this
+    hot path. A scrape from another thread may see one observation half-applied.
+    """
+    
+    def __init__(self):
+        self.methods: Dict[str, MethodStats] = {}
+    
+    def stats(self, method: str) -> MethodStats:
+        """Get the stats for a method, creating them on first use"""
+        return self.methods.setdefault(method, MethodStats())
+    
+    def collect(self):
+        latency = HistogramMetricFamily(
+            "taskqueue_redis_method_seconds",
+            "Latency of outermost TaskQueue method calls (nested TaskQueue calls are included, not recorded separately)",
+            labels=["method"]
+        )
+        round_trips = CounterMetricFamily(
+            "taskqueue_redis_round_trips",
+            "Redis round-trips made by outermost TaskQueue method calls, including their nested TaskQueue calls",
+            labels=["method"]
+        )
+        
+        for method, stats in list(self.methods.items()):
+            bounds = [str(bound) for bound in REDIS_METHOD_BUCKETS] + ["+Inf"]
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(bounds, list(stats.buckets)):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            
+            latency.add_metric([method], buckets, stats.total_seconds)
+            round_trips.add_metric([method], stats.round_trips)
+        
+        yield latency
+        yield round_trips
+
+
+REDIS_METHOD_STATS = RedisMethodCollector()
+REGISTRY.register(REDIS_METHOD_STATS)
+
+# WebSocket Metrics
+WEBSOCKET_BROADCAST_SECONDS = Histogram(
+    "taskqueue_websocket_broadcast_seconds",
+    "Time to broadcast one message to all connected clients",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "taskqueue_websocket_connections",
+    "Number of connected WebSocket clients"
+)
+
+# Queue Metrics
+QUEUE_DEPTH = Gauge(
+    "taskqueue_queue_depth",
+    "Number of tasks waiting in each queue",
+    ["queue"]
+)
+IN_FLIGHT_TASKS = Gauge(
+    "taskqueue_in_flight_tasks",
+    "Number of tasks currently held by workers"
+)
+
+# Worker Metrics
+WORKER_CONCURRENCY = Gauge(
+    "taskqueue_worker_concurrency",
+    "Number of concurrent task slots in this worker process"
+)
+WORKER_BUSY_SLOTS = Gauge(
+    "taskqueue_worker_busy_slots",
+    "Number of task slots currently processing a task"
+)
+EVENT_LOOP_LAG_SECONDS = Gauge(
+    "taskqueue_event_loop_lag_seconds",
+    "Event loop lag measured by the autoscaler (only updated with AUTOSCALE=true)"
+)
+
+
+_round_trips: ContextVar[Optional[List[int]]] = ContextVar("redis_round_trips", default=None)
+
+
+def record_round_trip():
+    """Count one Redis round-trip against the TaskQueue method being executed"""
+    round_trips = _round_trips.get()
+    if round_trips is not None:
+        round_trips[0] += 1
+
+
+def instrument_redis(func):
+    """Record latency and Redis round-trips of a TaskQueue method"""
+    stats = REDIS_METHOD_STATS.stats(func.__name__)
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        # Only the outermost call is recorded, so totals match real Redis traffic
+        if _round_trips.get() is not None:
+            return await func(*args, **kwargs)
+        
+        round_trips = [0]
+        token = _round_trips.set(round_trips)
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            stats.observe(time.perf_counter() - started, round_trips[0])
+            _round_trips.reset(token)
+    
+    return wrapper
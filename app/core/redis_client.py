@@ -1,8 +1,18 @@
 import redis.asyncio as redis
+from redis.asyncio.connection import Connection
 from app.core.config import settings
+from app.core.metrics import record_round_trip
 from typing import Optional
 
 
+class InstrumentedConnection(Connection):
+    """Redis connection that counts round-trips for metrics"""
+    
+    async def send_packed_command(self, command, check_health: bool = True):
+        record_round_trip()
+        await super().send_packed_command(command, check_health)
+
+
 class RedisClient:
     """Redis client for task queue management"""
     
@@ -11,19 +21,21 @@ class RedisClient:
     
     async def connect(self):
         """Connect to Redis"""
-        self.client = await redis.Redis(
+        pool = redis.ConnectionPool(
+            connection_class=InstrumentedConnection,
             host=settings.redis_host,
             port=settings.redis_port,
             db=settings.redis_db,
             password=settings.redis_password,
             decode_responses=True
         )
+        self.client = redis.Redis(connection_pool=pool)
         return self.client
     
     async def disconnect(self):
         """Disconnect from Redis"""
         if self.client:
-            await self.client.close()
+            await self.client.close(close_connection_pool=True)
     
     def get_client(self) -> redis.Redis:
         """Get Redis client instance"""
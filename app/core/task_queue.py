@@ -1,9 +1,12 @@
 import json
+import random
 import uuid
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.core.redis_client import redis_client
-from app.models.task import TaskStatus, TaskResponse, TaskCreate
+from app.core.config import settings
+from app.core.metrics import instrument_redis, QUEUE_DEPTH, IN_FLIGHT_TASKS
+from app.models.task import TaskStatus, TaskResponse, TaskCreate, TaskType
 
 
 class TaskQueue:
@@ -20,6 +23,41 @@ class TaskQueue:
         """Initialize Redis connection"""
         self.redis = redis_client.get_client()
     
+    def get_queue_key(self, task_type: TaskType) -> str:
+        """Get the queue key for a task type (batched types get their own queue)"""
+        if task_type in settings.batch_task_types:
+            return f"{self.QUEUE_KEY}:{task_type.value}"
+        return self.QUEUE_KEY
+    
+    def get_queue_keys(self) -> List[str]:
+        """Get all queue keys in use"""
+        return [self.QUEUE_KEY] + [
+            self.get_queue_key(task_type)
+            for task_type in settings.batch_task_types
+        ]
+    
+    @instrument_redis
+    async def get_next_queue_key(self) -> Optional[str]:
+        """Get the queue whose next task has the highest priority (ties broken randomly)"""
+        queue_keys = self.get_queue_keys()
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in queue_keys:
+                pipe.zrange(key, 0, 0, desc=True, withscores=True)
+            results = await pipe.execute()
+        
+        heads = {
+            key: result[0][1]
+            for key, result in zip(queue_keys, results)
+            if result
+        }
+        if not heads:
+            return None
+        
+        top_priority = max(heads.values())
+        return random.choice([key for key, score in heads.items() if score == top_priority])
+    
+    @instrument_redis
     async def create_task(self, task_data: TaskCreate) -> TaskResponse:
         """Create a new task and add to queue"""
         task_id = str(uuid.uuid4())
@@ -49,12 +87,13 @@ class TaskQueue:
         
         # Add to priority queue (using sorted set with priority as score)
         await self.redis.zadd(
-            self.QUEUE_KEY,
+            self.get_queue_key(task_data.task_type),
             {task_id: task_data.priority}
         )
         
         return TaskResponse(**task)
     
+    @instrument_redis
     async def get_task(self, task_id: str) -> Optional[TaskResponse]:
         """Get task by ID"""
         task_data = await self.redis.get(f"{self.TASK_PREFIX}{task_id}")
@@ -64,6 +103,22 @@ class TaskQueue:
         task_dict = json.loads(task_data)
         return TaskResponse(**task_dict)
     
+    @instrument_redis
+    async def get_tasks(self, task_ids: List[str]) -> List[TaskResponse]:
+        """Get multiple tasks by ID in a single round-trip"""
+        if not task_ids:
+            return []
+        
+        results = await self.redis.mget(
+            [f"{self.TASK_PREFIX}{task_id}" for task_id in task_ids]
+        )
+        return [
+            TaskResponse(**json.loads(task_data))
+            for task_data in results
+            if task_data
+        ]
+    
+    @instrument_redis
     async def update_task(
         self,
         task_id: str,
@@ -100,6 +155,7 @@ class TaskQueue:
         
         return TaskResponse(**task_dict)
     
+    @instrument_redis
     async def get_next_task(self) -> Optional[str]:
         """Get next task from queue (highest priority)"""
         # Get task with highest priority (using ZPOPMAX for atomic operation)
@@ -115,6 +171,84 @@ class TaskQueue:
         
         return task_id
     
+    @instrument_redis
+    async def get_next_tasks(self, task_type: TaskType, count: int) -> List[str]:
+        """Get up to `count` tasks from a batched task type's queue"""
+        result = await self.redis.zpopmax(self.get_queue_key(task_type), count)
+        
+        if not result:
+            return []
+        
+        task_ids = [task_id for task_id, _ in result]
+        
+        # Add to processing set
+        await self.redis.sadd(self.PROCESSING_SET, *task_ids)
+        
+        return task_ids
+    
+    @instrument_redis
+    async def start_tasks(self, task_ids: List[str]) -> List[TaskResponse]:
+        """Mark multiple tasks as processing in one pipeline"""
+        tasks = await self.get_tasks(task_ids)
+        now = datetime.utcnow()
+        
+        # Tasks whose record has disappeared can never be finished
+        missing = set(task_ids) - {task.task_id for task in tasks}
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if missing:
+                pipe.srem(self.PROCESSING_SET, *missing)
+            for task in tasks:
+                task.status = TaskStatus.PROCESSING
+                task.started_at = now
+                task.updated_at = now
+                pipe.set(
+                    f"{self.TASK_PREFIX}{task.task_id}",
+                    task.model_dump_json()
+                )
+            await pipe.execute()
+        
+        return tasks
+    
+    @instrument_redis
+    async def finish_tasks(
+        self,
+        completed: List[str],
+        failed: Dict[str, str],
+        requeued: List[str]
+    ):
+        """Write the outcome of a batch of tasks in one pipeline"""
+        task_ids = completed + list(failed) + requeued
+        tasks = {task.task_id: task for task in await self.get_tasks(task_ids)}
+        now = datetime.utcnow()
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if task_ids:
+                pipe.srem(self.PROCESSING_SET, *task_ids)
+            
+            for task_id, task in tasks.items():
+                if task_id in failed:
+                    task.status = TaskStatus.FAILED
+                    task.error = failed[task_id]
+                    task.completed_at = now
+                elif task_id in completed:
+                    task.status = TaskStatus.COMPLETED
+                    task.progress = 100
+                    task.completed_at = now
+                else:
+                    task.status = TaskStatus.RETRYING
+                    task.retry_count += 1
+                    pipe.zadd(
+                        self.get_queue_key(task.task_type),
+                        {task_id: task.priority}
+                    )
+                
+                task.updated_at = now
+                pipe.set(f"{self.TASK_PREFIX}{task_id}", task.model_dump_json())
+            
+            await pipe.execute()
+    
+    @instrument_redis
     async def mark_task_completed(self, task_id: str):
         """Mark task as completed and remove from processing set"""
         await self.redis.srem(self.PROCESSING_SET, task_id)
@@ -125,6 +259,7 @@ class TaskQueue:
             progress=100
         )
     
+    @instrument_redis
     async def mark_task_failed(self, task_id: str, error: str):
         """Mark task as failed"""
         await self.redis.srem(self.PROCESSING_SET, task_id)
@@ -135,14 +270,18 @@ class TaskQueue:
             completed_at=datetime.utcnow()
         )
     
+    @instrument_redis
     async def requeue_task(self, task_id: str, priority: int):
         """Requeue a task for retry"""
         await self.redis.srem(self.PROCESSING_SET, task_id)
-        await self.redis.zadd(self.QUEUE_KEY, {task_id: priority})
         
         task_data = await self.redis.get(f"{self.TASK_PREFIX}{task_id}")
         if task_data:
             task_dict = json.loads(task_data)
+            await self.redis.zadd(
+                self.get_queue_key(TaskType(task_dict["task_type"])),
+                {task_id: priority}
+            )
             task_dict["retry_count"] = task_dict.get("retry_count", 0) + 1
             task_dict["status"] = TaskStatus.RETRYING
             task_dict["updated_at"] = datetime.utcnow().isoformat()
@@ -152,6 +291,7 @@ class TaskQueue:
                 json.dumps(task_dict)
             )
     
+    @instrument_redis
     async def get_all_tasks(self, limit: int = 100) -> List[TaskResponse]:
         """Get all tasks"""
         tasks = []
@@ -178,6 +318,7 @@ class TaskQueue:
         
         return sorted(tasks, key=lambda x: x.created_at, reverse=True)[:limit]
     
+    @instrument_redis
     async def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
         all_tasks = await self.get_all_tasks(limit=1000)
@@ -192,6 +333,27 @@ class TaskQueue:
         }
         
         return stats
+    
+    @instrument_redis
+    async def get_queue_depths(self) -> Tuple[Dict[str, int], int]:
+        """Get the number of queued tasks per queue key and the number in flight"""
+        queue_keys = self.get_queue_keys()
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in queue_keys:
+                pipe.zcard(key)
+            pipe.scard(self.PROCESSING_SET)
+            *depths, in_flight = await pipe.execute()
+        
+        return dict(zip(queue_keys, depths)), in_flight
+    
+    async def update_metrics(self):
+        """Refresh queue depth and in-flight gauges"""
+        depths, in_flight = await self.get_queue_depths()
+        
+        for key, depth in depths.items():
+            QUEUE_DEPTH.labels(key).set(depth)
+        IN_FLIGHT_TASKS.set(in_flight)
 
 
 task_queue = TaskQueue()
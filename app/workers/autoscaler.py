@@ -0,0 +1,176 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Set
+from app.core.task_queue import task_queue
+from app.core.redis_client import redis_client
+from app.core.config import settings
+from app.core.metrics import WORKER_CONCURRENCY, EVENT_LOOP_LAG_SECONDS
+from app.workers.task_worker import TaskWorker
+
+
+class WorkerAutoscaler:
+    """Grows and shrinks the number of concurrent task slots in a worker process"""
+    
+    # Maximum number of queue wait samples kept between scaling decisions
+    QUEUE_WAIT_WINDOW = 1000
+    
+    def __init__(self):
+        self.running = False
+        self.workers: List[TaskWorker] = []
+        self.draining: Set[TaskWorker] = set()
+        self.tasks: Dict[TaskWorker, asyncio.Task] = {}
+        self.next_worker_id = 0
+        self.queue_waits: Deque[float] = deque(maxlen=self.QUEUE_WAIT_WINDOW)
+    
+    @property
+    def concurrency(self) -> int:
+        """Current number of task slots, including retired ones still finishing a task"""
+        return len(self.workers) + len(self.draining)
+    
+    @property
+    def busy_slots(self) -> int:
+        """Number of task slots currently processing a task"""
+        return sum(1 for worker in self.workers if worker.busy) + len(self.draining)
+    
+    async def start(self):
+        """Start the autoscaler and its initial task slots"""
+        print(f"Autoscaler starting ({settings.min_workers}-{settings.max_workers} workers)...")
+        self.running = True
+        
+        # Initialize Redis and task queue once for all task slots
+        await redis_client.connect()
+        await task_queue.initialize()
+        
+        self.scale_to(settings.min_workers)
+        
+        loop = asyncio.get_running_loop()
+        last_cpu = time.process_time()
+        
+        while self.running:
+            last_tick = loop.time()
+            await asyncio.sleep(settings.autoscale_interval)
+            
+            # Anything beyond the requested sleep is time the loop was too busy to wake us
+            now = loop.time()
+            loop_lag = max(0.0, now - last_tick - settings.autoscale_interval)
+            cpu = time.process_time()
+            cpu_usage = (cpu - last_cpu) / (now - last_tick)
+            last_cpu = cpu
+            
+            try:
+                started = loop.time()
+                depths, _ = await task_queue.get_queue_depths()
+                redis_latency = loop.time() - started
+            except Exception as e:
+                print(f"Autoscaler error: {str(e)}")
+                continue
+            
+            # Each decision only looks at waits observed since the previous one
+            queue_waits = sorted(self.queue_waits)
+            self.queue_waits.clear()
+            wait_p95 = queue_waits[int(len(queue_waits) * 0.95)] if queue_waits else 0.0
+            
+            target = self.desired_concurrency(
+                sum(depths.values()),
+                wait_p95,
+                loop_lag,
+                redis_latency,
+                cpu_usage
+            )
+            
+            if target != self.concurrency:
+                print(
+                    f"Autoscaler scaling {self.concurrency} -> {target} workers "
+                    f"(queue depth {sum(depths.values())}, loop lag {loop_lag * 1000:.0f}ms, "
+                    f"redis {redis_latency * 1000:.0f}ms, cpu {cpu_usage:.0%})"
+                )
+                self.scale_to(target)
+            
+            EVENT_LOOP_LAG_SECONDS.set(loop_lag)
+            WORKER_CONCURRENCY.set(self.concurrency)
+    
+    def desired_concurrency(
+        self,
+        queue_depth: int,
+        wait_p95: float,
+        loop_lag: float,
+        redis_latency: float,
+        cpu_usage: float
+    ) -> int:
+        """Decide how many task slots to run from the latest observations"""
+        current = self.concurrency
+        busy = self.busy_slots
+        
+        saturated = (
+            loop_lag * 1000 > settings.autoscale_max_loop_lag_ms
+            or redis_latency * 1000 > settings.autoscale_max_redis_latency_ms
+            or cpu_usage > settings.autoscale_max_cpu
+        )
+        
+        if saturated:
+            # More slots would only add contention, so back off
+            target = current - max(1, current // 4)
+        elif queue_depth and busy >= current:
+            # Tasks are waiting for a free slot; grow fast if they have waited too long
+            if wait_p95 * 1000 > settings.autoscale_target_wait_ms:
+                target = min(current * 2, current + queue_depth)
+            else:
+                target = current + 1
+        elif not queue_depth and busy < current:
+            # Idle slots, shrink gradually
+            target = max(busy, current - 1)
+        else:
+            target = current
+        
+        return max(settings.min_workers, min(settings.max_workers, target))
+    
+    def scale_to(self, target: int):
+        """Start or retire task slots until there are `target` of them"""
+        while self.concurrency < target:
+            worker = TaskWorker(self.next_worker_id, queue_waits=self.queue_waits)
+            self.next_worker_id += 1
+            self.workers.append(worker)
+            
+            task = asyncio.create_task(worker.run())
+            self.tasks[worker] = task
+            task.add_done_callback(lambda _, worker=worker: self.remove_worker(worker))
+        
+        # Retire idle slots first
+        self.workers.sort(key=lambda worker: worker.busy)
+        while len(self.workers) > target:
+            worker = self.workers.pop(0)
+            worker.running = False
+            
+            if worker.busy:
+                # Busy slots finish their current task and count until they exit
+                self.draining.add(worker)
+            else:
+                self.tasks[worker].cancel()
+    
+    def remove_worker(self, worker: TaskWorker):
+        """Forget a task slot whose coroutine has exited"""
+        self.tasks.pop(worker, None)
+        self.draining.discard(worker)
+        if worker in self.workers:
+            self.workers.remove(worker)
+    
+    async def stop(self):
+        """Stop the autoscaler and all task slots"""
+        print("Autoscaler stopping...")
+        self.running = False
+        self.scale_to(0)
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        await redis_client.disconnect()
+
+
+async def run_autoscaler():
+    """Run an autoscaling worker pool"""
+    autoscaler = WorkerAutoscaler()
+    try:
+        await autoscaler.start()
+    except KeyboardInterrupt:
+        await autoscaler.stop()
+    except Exception as e:
+        print(f"Autoscaler crashed: {str(e)}")
+        await autoscaler.stop()
@@ -1,44 +1,86 @@
 import asyncio
 import random
+import time
 from datetime import datetime
+from typing import Deque, Dict, List, Optional
 from app.core.task_queue import task_queue
 from app.core.redis_client import redis_client
 from app.core.config import settings
-from app.models.task import TaskStatus, TaskType
-from app.api.websocket import broadcast_task_update
+from app.core.metrics import QUEUE_WAIT_SECONDS, TASK_EXECUTION_SECONDS, WORKER_BUSY_SLOTS
+from app.models.task import TaskStatus, TaskType, TaskResponse
+from app.api.websocket import broadcast_task_update, broadcast_tasks_update
 
 
 class TaskWorker:
     """Worker to process tasks from the queue"""
     
-    def __init__(self, worker_id: int):
+    # How often to poll for more tasks while filling a batch
+    BATCH_POLL_INTERVAL = 0.01
+    
+    def __init__(self, worker_id: int, queue_waits: Optional[Deque[float]] = None):
         self.worker_id = worker_id
         self.running = False
+        self.busy = False
+        self.queue_waits = queue_waits
     
     async def start(self):
         """Start the worker"""
-        print(f"Worker {self.worker_id} starting...")
-        self.running = True
-        
         # Initialize Redis and task queue
         await redis_client.connect()
         await task_queue.initialize()
         
+        await self.run()
+    
+    async def run(self):
+        """Process tasks until stopped, using the existing Redis connection"""
+        print(f"Worker {self.worker_id} starting...")
+        self.running = True
+        
         while self.running:
             try:
-                # Get next task from queue
-                task_id = await task_queue.get_next_task()
-                
-                if task_id:
-                    await self.process_task(task_id)
-                else:
+                if not await self.process_next():
                     # No tasks available, wait before checking again
                     await asyncio.sleep(1)
-                    
+            
             except Exception as e:
                 print(f"Worker {self.worker_id} error: {str(e)}")
                 await asyncio.sleep(5)
     
+    async def process_next(self) -> bool:
+        """Process the next task or batch, returning False if all queues are empty"""
+        self.busy = True
+        WORKER_BUSY_SLOTS.inc()
+        try:
+            if not settings.batch_task_types:
+                return await self.process_from_queue(task_queue.QUEUE_KEY)
+            
+            # Serve whichever queue holds the highest-priority task. Another slot may
+            # empty it between the peek and the pop, so pick again until a pop succeeds
+            while True:
+                queue_key = await task_queue.get_next_queue_key()
+                if queue_key is None:
+                    return False
+                if await self.process_from_queue(queue_key):
+                    return True
+        finally:
+            self.busy = False
+            WORKER_BUSY_SLOTS.dec()
+    
+    async def process_from_queue(self, queue_key: str) -> bool:
+        """Pop and process a task or batch from one queue, returning False if it was empty"""
+        for task_type in settings.batch_task_types:
+            if queue_key == task_queue.get_queue_key(task_type):
+                return await self.process_next_batch(task_type)
+        
+        # Get next task from queue
+        task_id = await task_queue.get_next_task()
+        
+        if not task_id:
+            return False
+        
+        await self.process_task(task_id)
+        return True
+    
     async def process_task(self, task_id: str):
         """Process a single task"""
         try:
@@ -54,12 +96,14 @@ class TaskWorker:
                 return
             
             print(f"Worker {self.worker_id} processing task {task_id} ({task.task_type})")
+            self.observe_queue_wait([task])
             
             # Broadcast initial processing status
             await broadcast_task_update(task_id)
             
             # Simulate task processing based on task type
-            await self.execute_task(task_id, task.task_type, task.payload)
+            with TASK_EXECUTION_SECONDS.labels(task.task_type.value).time():
+                await self.execute_task(task_id, task.task_type, task.payload)
             
             # Mark task as completed
             await task_queue.mark_task_completed(task_id)
@@ -67,7 +111,7 @@ class TaskWorker:
             
             # Broadcast completion
             await broadcast_task_update(task_id)
-            
+        
         except Exception as e:
             error_msg = str(e)
             print(f"Worker {self.worker_id} failed task {task_id}: {error_msg}")
@@ -84,6 +128,110 @@ class TaskWorker:
                 await task_queue.mark_task_failed(task_id, error_msg)
                 await broadcast_task_update(task_id)
     
+    async def process_next_batch(self, task_type: TaskType) -> bool:
+        """Collect and process one batch of a batched task type, returning False if none were queued"""
+        task_ids = await task_queue.get_next_tasks(task_type, settings.batch_size)
+        
+        if not task_ids:
+            return False
+        
+        # Wait up to batch_wait_ms for the batch to fill
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.batch_wait_ms / 1000
+        while len(task_ids) < settings.batch_size and loop.time() < deadline:
+            await asyncio.sleep(min(self.BATCH_POLL_INTERVAL, deadline - loop.time()))
+            task_ids += await task_queue.get_next_tasks(
+                task_type,
+                settings.batch_size - len(task_ids)
+            )
+        
+        await self.process_batch(task_type, task_ids)
+        return True
+    
+    async def process_batch(self, task_type: TaskType, task_ids: List[str]):
+        """Process a batch of same-type tasks with a single handler call"""
+        tasks = await task_queue.start_tasks(task_ids)
+        
+        if not tasks:
+            return
+        
+        print(f"Worker {self.worker_id} processing batch of {len(tasks)} {task_type.value} tasks")
+        self.observe_queue_wait(tasks)
+        await broadcast_tasks_update([task.task_id for task in tasks])
+        
+        started = time.perf_counter()
+        try:
+            errors = await self.execute_batch(task_type, tasks)
+        except Exception as e:
+            # A handler crash fails every item in the batch
+            errors = {task.task_id: str(e) for task in tasks}
+        
+        execution_time = (time.perf_counter() - started) / len(tasks)
+        execution_histogram = TASK_EXECUTION_SECONDS.labels(task_type.value)
+        for _ in tasks:
+            execution_histogram.observe(execution_time)
+        
+        completed = []
+        failed = {}
+        requeued = []
+        for task in tasks:
+            # Only an explicit None means success; a task left out of the result did not run
+            error_msg = errors.get(task.task_id, "No result returned by batch handler")
+            if error_msg is None:
+                completed.append(task.task_id)
+            elif task.retry_count < settings.max_retries:
+                requeued.append(task.task_id)
+            else:
+                failed[task.task_id] = error_msg
+        
+        await task_queue.finish_tasks(completed, failed, requeued)
+        print(
+            f"Worker {self.worker_id} finished batch: {len(completed)} completed, "
+            f"{len(requeued)} requeued, {len(failed)} failed"
+        )
+        
+        await broadcast_tasks_update([task.task_id for task in tasks])
+    
+    def observe_queue_wait(self, tasks: List[TaskResponse]):
+        """Record how long freshly started tasks waited in the queue"""
+        for task in tasks:
+            if task.retry_count == 0 and task.started_at:
+                wait = (task.started_at - task.created_at).total_seconds()
+                QUEUE_WAIT_SECONDS.labels(task.task_type.value).observe(wait)
+                if self.queue_waits is not None:
+                    self.queue_waits.append(wait)
+    
+    async def execute_batch(
+        self,
+        task_type: TaskType,
+        tasks: List[TaskResponse]
+    ) -> Dict[str, Optional[str]]:
+        """Execute a batch of tasks, returning an error message (or None on success) for every task_id"""
+        
+        # Simulating one round of work for the whole batch
+        await asyncio.sleep(random.uniform(0.5, 2.0))
+        
+        errors = {}
+        for task in tasks:
+            # Simulate occasional per-item failures for testing
+            if random.random() < 0.05:  # 5% chance of failure
+                errors[task.task_id] = "Simulated task failure for testing"
+                continue
+            
+            if task_type == TaskType.EMAIL:
+                print(f"Sending email to: {task.payload.get('recipient', 'unknown')}")
+            elif task_type == TaskType.DATA_PROCESSING:
+                print(f"Processing data: {task.payload.get('data_size', 0)} records")
+            elif task_type == TaskType.FILE_CONVERSION:
+                print(f"Converting file: {task.payload.get('filename', 'unknown')}")
+            elif task_type == TaskType.API_CALL:
+                print(f"Calling API: {task.payload.get('endpoint', 'unknown')}")
+            elif task_type == TaskType.REPORT_GENERATION:
+                print(f"Generating report: {task.payload.get('report_type', 'unknown')}")
+            errors[task.task_id] = None
+        
+        return errors
+    
     async def execute_task(self, task_id: str, task_type: TaskType, payload: dict):
         """Execute the actual task logic"""
         
@@ -0,0 +1,400 @@
+"""
+Load-generation and latency benchmarks for the task queue
+Run from the repository root: python -m benchmarks.queue_benchmark
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.api.websocket import manager
+from app.core.config import settings
+from app.core.metrics import instrument_redis
+from app.core.redis_client import redis_client
+from app.core.task_queue import TaskQueue, task_queue
+from app.models.task import TaskCreate, TaskResponse, TaskType
+from app.workers.task_worker import TaskWorker
+
+
+class BenchmarkWorker(TaskWorker):
+    """Worker whose handlers return immediately, so only queue overhead is measured"""
+    
+    def __init__(self, worker_id: int):
+        super().__init__(worker_id)
+        self.completed = 0
+    
+    async def process_task(self, task_id: str):
+        await super().process_task(task_id)
+        self.completed += 1
+    
+    async def process_batch(self, task_type: TaskType, task_ids: List[str]):
+        await super().process_batch(task_type, task_ids)
+        self.completed += len(task_ids)
+    
+    async def execute_task(self, task_id: str, task_type: TaskType, payload: dict):
+        return None
+    
+    async def execute_batch(self, task_type: TaskType, tasks: List[TaskResponse]):
+        return {task.task_id: None for task in tasks}
+
+
+class FakeWebSocket:
+    """Stand-in client that pays the JSON encoding cost of a real send"""
+    
+    def __init__(self):
+        self.bytes_sent = 0
+    
+    async def send_json(self, message: dict):
+        self.bytes_sent += len(json.dumps(message))
+        await asyncio.sleep(0)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) as millisecond percentiles"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index] * 1000
+    
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Get the current commit hash, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+async def connect(backend: str, redis_db: int):
+    """Connect the shared Redis client to the chosen backend"""
+    if backend == "memory":
+        try:
+            import fakeredis.aioredis
+        except ImportError:
+            raise SystemExit("The memory backend requires fakeredis: pip install fakeredis")
+        redis_client.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    else:
+        settings.redis_db = redis_db
+        await redis_client.connect()
+    
+    await task_queue.initialize()
+
+
+async def reset():
+    """Clear all benchmark data"""
+    await task_queue.redis.flushdb()
+
+
+def make_task(i: int) -> TaskCreate:
+    """Build a small task for load generation"""
+    return TaskCreate(
+        name=f"bench-{i}",
+        task_type=TaskType.EMAIL if i % 2 else TaskType.API_CALL,
+        payload={"recipient": f"user{i}@example.com"},
+        priority=i % 10 + 1
+    )
+
+
+async def enqueue(count: int, concurrency: int) -> List[float]:
+    """Create `count` tasks from `concurrency` producers, returning per-call latencies"""
+    latencies = []
+    
+    async def producer(start: int):
+        for i in range(start, count, concurrency):
+            started = time.perf_counter()
+            await task_queue.create_task(make_task(i))
+            latencies.append(time.perf_counter() - started)
+    
+    await asyncio.gather(*(producer(i) for i in range(concurrency)))
+    return latencies
+
+
+async def bench_enqueue(count: int, concurrency: int) -> Dict[str, Any]:
+    """Measure create_task throughput"""
+    await reset()
+    started = time.perf_counter()
+    latencies = await enqueue(count, concurrency)
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "tasks": count,
+        "concurrency": concurrency,
+        "tasks_per_sec": count / elapsed,
+        "latency": summarize(latencies),
+    }
+
+
+async def bench_dequeue(count: int, concurrency: int) -> Dict[str, Any]:
+    """Measure dequeue throughput along the same queue selection path workers use"""
+    await reset()
+    await enqueue(count, concurrency)
+    latencies = []
+    dequeued = 0
+    
+    async def dequeue_once() -> List[str]:
+        while True:
+            queue_key = task_queue.QUEUE_KEY
+            if settings.batch_task_types:
+                queue_key = await task_queue.get_next_queue_key()
+                if queue_key is None:
+                    return []
+            
+            task_ids = None
+            for task_type in settings.batch_task_types:
+                if queue_key == task_queue.get_queue_key(task_type):
+                    task_ids = await task_queue.get_next_tasks(task_type, settings.batch_size)
+            if task_ids is None:
+                task_id = await task_queue.get_next_task()
+                task_ids = [task_id] if task_id else []
+            
+            # An empty pop after a peek means another consumer won the race; pick again
+            if task_ids or not settings.batch_task_types:
+                return task_ids
+    
+    async def consumer():
+        nonlocal dequeued
+        while True:
+            started = time.perf_counter()
+            task_ids = await dequeue_once()
+            if not task_ids:
+                return
+            latencies.append(time.perf_counter() - started)
+            dequeued += len(task_ids)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(consumer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "tasks": dequeued,
+        "concurrency": concurrency,
+        "tasks_per_sec": dequeued / elapsed,
+        "latency": summarize(latencies),
+    }
+
+
+async def bench_end_to_end(count: int, workers: int, timeout: float) -> Dict[str, Any]:
+    """Measure enqueue-to-complete latency through the real worker code path"""
+    await reset()
+    stop = asyncio.Event()
+    
+    async def run(worker: TaskWorker):
+        while not stop.is_set():
+            if not await worker.process_next():
+                await asyncio.sleep(0.001)
+    
+    pool = [BenchmarkWorker(i) for i in range(workers)]
+    runners = [asyncio.create_task(run(worker)) for worker in pool]
+    
+    # Worker progress logging would drown out the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        await enqueue(count, workers)
+        # Handlers never fail, so every processed task has completed
+        while sum(worker.completed for worker in pool) < count:
+            failed = [runner for runner in runners if runner.done()]
+            if failed or time.perf_counter() - started > timeout:
+                for runner in runners:
+                    runner.cancel()
+                if failed:
+                    raise RuntimeError(f"Benchmark worker failed: {failed[0].exception()!r}")
+                raise RuntimeError(f"End-to-end benchmark did not finish within {timeout}s")
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        
+        stop.set()
+        await asyncio.gather(*runners)
+    
+    tasks = await task_queue.get_all_tasks(limit=count)
+    latencies = [
+        (task.completed_at - task.created_at).total_seconds()
+        for task in tasks
+        if task.completed_at
+    ]
+    
+    return {
+        "tasks": count,
+        "workers": workers,
+        "batch_task_types": list(settings.batch_task_types),
+        "tasks_per_sec": count / elapsed,
+        "latency": summarize(latencies),
+    }
+
+
+async def bench_reads(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """Measure get_all_tasks and get_stats latency as the number of tasks grows"""
+    results = []
+    
+    for size in sizes:
+        await reset()
+        await enqueue(size, 10)
+        
+        timings = {"get_all_tasks": [], "get_stats": []}
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await task_queue.get_all_tasks(limit=100)
+            timings["get_all_tasks"].append(time.perf_counter() - started)
+            
+            started = time.perf_counter()
+            await task_queue.get_stats()
+            timings["get_stats"].append(time.perf_counter() - started)
+        
+        results.append({
+            "tasks": size,
+            "get_all_tasks": summarize(timings["get_all_tasks"]),
+            "get_stats": summarize(timings["get_stats"]),
+        })
+    
+    return results
+
+
+async def bench_fanout(client_counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """Measure ConnectionManager.broadcast duration as the number of clients grows"""
+    await reset()
+    task = await task_queue.create_task(make_task(0))
+    stats = await task_queue.get_stats()
+    message = {
+        "type": "task_update",
+        "task": json.loads(task.model_dump_json()),
+        "stats": stats
+    }
+    results = []
+    
+    for clients in client_counts:
+        manager.active_connections = {FakeWebSocket() for _ in range(clients)}
+        
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await manager.broadcast(message)
+            timings.append(time.perf_counter() - started)
+        
+        results.append({"clients": clients, "broadcast": summarize(timings)})
+    
+    manager.active_connections = set()
+    return results
+
+
+def remove_instrumentation():
+    """Strip instrument_redis from TaskQueue methods, for A/B runs against the instrumented code"""
+    for name, method in list(vars(TaskQueue).items()):
+        if hasattr(method, "__wrapped__"):
+            setattr(TaskQueue, name, method.__wrapped__)
+
+
+async def bench_instrumentation(
+    enqueue: Dict[str, Any],
+    dequeue: Dict[str, Any],
+    calls: int = 200000
+) -> Dict[str, Any]:
+    """Measure the per-call cost of instrument_redis relative to real TaskQueue calls"""
+    async def noop():
+        return None
+    
+    instrumented = instrument_redis(noop)
+    timings = {}
+    for name, func in [("plain", noop), ("instrumented", instrumented)]:
+        started = time.perf_counter()
+        for _ in range(calls):
+            await func()
+        timings[name] = (time.perf_counter() - started) / calls
+    
+    overhead = timings["instrumented"] - timings["plain"]
+    result = {"overhead_us_per_call": overhead * 1e6}
+    
+    # Share of the mean latency of single-round-trip and multi-round-trip methods
+    for name, bench in [("create_task", enqueue), ("get_next_task", dequeue)]:
+        mean_ms = bench["latency"].get("mean_ms")
+        if mean_ms:
+            result[f"overhead_pct_of_{name}"] = overhead * 1000 / mean_ms * 100
+    
+    return result
+
+
+async def main(args: argparse.Namespace):
+    """Run all benchmarks and write the results as JSON"""
+    if args.uninstrumented:
+        remove_instrumentation()
+    
+    await connect(args.backend, args.redis_db)
+    
+    enqueue = await bench_enqueue(args.tasks, args.concurrency)
+    dequeue = await bench_dequeue(args.tasks, args.concurrency)
+    
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "instrumented": not args.uninstrumented,
+        },
+        "enqueue": enqueue,
+        "dequeue": dequeue,
+        "instrumentation": await bench_instrumentation(enqueue, dequeue),
+        "end_to_end": await bench_end_to_end(args.e2e_tasks, args.concurrency, args.timeout),
+        "reads": await bench_reads(args.sizes, args.repeat),
+        "websocket_fanout": await bench_fanout(args.clients, args.repeat),
+    }
+    
+    await reset()
+    await redis_client.disconnect()
+    
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Task queue benchmarks")
+    parser.add_argument("--backend", choices=["redis", "memory"], default="redis",
+                        help="Local Redis or an in-memory stand-in (fakeredis)")
+    parser.add_argument("--redis-db", type=int, default=15,
+                        help="Redis database to use; it is flushed between runs")
+    parser.add_argument("--tasks", type=int, default=5000,
+                        help="Tasks for the enqueue/dequeue benchmarks")
+    parser.add_argument("--e2e-tasks", type=int, default=1000,
+                        help="Tasks for the end-to-end benchmark")
+    parser.add_argument("--concurrency", type=int, default=settings.workers,
+                        help="Concurrent producers, consumers and workers")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="Abort the end-to-end benchmark after this many seconds")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Task counts for the read benchmarks")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="Client counts for the WebSocket fan-out benchmark")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="Samples per read and fan-out measurement")
+    parser.add_argument("--uninstrumented", action="store_true",
+                        help="Strip Redis metrics instrumentation from TaskQueue methods")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="Where to write the JSON results")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -1,8 +1,9 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from contextlib import asynccontextmanager
 from pathlib import Path
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 from app.api import tasks, websocket
 from app.core.redis_client import redis_client
@@ -71,6 +72,17 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint"""
+    try:
+        await task_queue.update_metrics()
+    except Exception as e:
+        # Still serve the in-process metrics, they matter most when Redis is struggling
+        print(f"Metrics refresh error: {str(e)}")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     from app.core.config import settings
@@ -0,0 +1,10 @@
+import pytest
+import fakeredis.aioredis
+from app.core.task_queue import task_queue
+
+
+@pytest.fixture
+def queue():
+    """Task queue backed by an in-memory Redis"""
+    task_queue.redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return task_queue
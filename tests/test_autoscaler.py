@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.workers.autoscaler import WorkerAutoscaler
+from app.workers.task_worker import TaskWorker
+
+
+@pytest.fixture(autouse=True)
+def autoscale_settings(monkeypatch):
+    monkeypatch.setattr(settings, "min_workers", 1)
+    monkeypatch.setattr(settings, "max_workers", 16)
+    monkeypatch.setattr(settings, "autoscale_target_wait_ms", 1000)
+    monkeypatch.setattr(settings, "autoscale_max_loop_lag_ms", 100)
+    monkeypatch.setattr(settings, "autoscale_max_redis_latency_ms", 50)
+    monkeypatch.setattr(settings, "autoscale_max_cpu", 0.9)
+
+
+def autoscaler_with(slots: int, busy: int) -> WorkerAutoscaler:
+    """Autoscaler holding `slots` task slots, `busy` of them processing a task"""
+    autoscaler = WorkerAutoscaler()
+    for i in range(slots):
+        worker = TaskWorker(i)
+        worker.busy = i < busy
+        autoscaler.workers.append(worker)
+    return autoscaler
+
+
+def decide(autoscaler: WorkerAutoscaler, queue_depth: int = 0, wait_p95: float = 0.0,
+           loop_lag: float = 0.0, redis_latency: float = 0.0, cpu_usage: float = 0.1) -> int:
+    return autoscaler.desired_concurrency(queue_depth, wait_p95, loop_lag, redis_latency, cpu_usage)
+
+
+@pytest.mark.parametrize("signal", [
+    {"loop_lag": 0.5},
+    {"redis_latency": 0.2},
+    {"cpu_usage": 1.0},
+])
+def test_backs_off_when_saturated(signal):
+    assert decide(autoscaler_with(8, busy=8), queue_depth=100, wait_p95=5.0, **signal) == 6
+
+
+def test_grows_by_one_when_all_slots_busy():
+    assert decide(autoscaler_with(4, busy=4), queue_depth=100, wait_p95=0.5) == 5
+
+
+def test_grows_fast_when_queue_wait_exceeds_target():
+    assert decide(autoscaler_with(4, busy=4), queue_depth=100, wait_p95=5.0) == 8
+
+
+def test_fast_growth_is_capped_by_queue_depth():
+    assert decide(autoscaler_with(4, busy=4), queue_depth=2, wait_p95=5.0) == 6
+
+
+def test_does_not_grow_with_idle_slots():
+    assert decide(autoscaler_with(4, busy=0), queue_depth=3, wait_p95=5.0) == 4
+
+
+def test_shrinks_one_idle_slot_when_queue_empty():
+    assert decide(autoscaler_with(4, busy=1)) == 3
+
+
+def test_respects_min_workers(monkeypatch):
+    monkeypatch.setattr(settings, "min_workers", 2)
+    
+    assert decide(autoscaler_with(2, busy=0)) == 2
+    assert decide(autoscaler_with(2, busy=2), queue_depth=10, cpu_usage=1.0) == 2
+
+
+def test_respects_max_workers(monkeypatch):
+    monkeypatch.setattr(settings, "max_workers", 6)
+    
+    assert decide(autoscaler_with(4, busy=4), queue_depth=100, wait_p95=5.0) == 6
+
+
+def test_draining_slots_count_until_they_exit(monkeypatch):
+    async def run():
+        release = asyncio.Event()
+        
+        async def busy_run(self):
+            self.busy = True
+            await release.wait()
+            self.busy = False
+        
+        monkeypatch.setattr(TaskWorker, "run", busy_run)
+        
+        autoscaler = WorkerAutoscaler()
+        autoscaler.scale_to(4)
+        await asyncio.sleep(0)
+        
+        autoscaler.scale_to(2)
+        during = autoscaler.concurrency, len(autoscaler.draining)
+        
+        # Scaling back up cannot exceed the target while slots are draining
+        autoscaler.scale_to(4)
+        regrown = autoscaler.concurrency
+        
+        release.set()
+        await asyncio.gather(*autoscaler.tasks.values())
+        await asyncio.sleep(0)
+        return during, regrown, autoscaler.concurrency
+    
+    during, regrown, after = asyncio.run(run())
+    
+    assert during == (4, 2)
+    assert regrown == 4
+    assert after == 0
@@ -0,0 +1,32 @@
+import asyncio
+from prometheus_client import REGISTRY
+from app.core.metrics import instrument_redis, record_round_trip
+
+
+@instrument_redis
+async def inner_metrics_call():
+    record_round_trip()
+
+
+@instrument_redis
+async def outer_metrics_call():
+    record_round_trip()
+    await inner_metrics_call()
+
+
+def sample(name: str, method: str) -> float:
+    """Read a single labelled sample from the default registry"""
+    return REGISTRY.get_sample_value(name, {"method": method}) or 0.0
+
+
+def test_nested_calls_are_recorded_by_outermost_method_only():
+    asyncio.run(outer_metrics_call())
+    
+    assert sample("taskqueue_redis_round_trips_total", "outer_metrics_call") == 2
+    assert sample("taskqueue_redis_round_trips_total", "inner_metrics_call") == 0
+    assert sample("taskqueue_redis_method_seconds_count", "outer_metrics_call") == 1
+    assert sample("taskqueue_redis_method_seconds_count", "inner_metrics_call") == 0
+    assert REGISTRY.get_sample_value(
+        "taskqueue_redis_method_seconds_bucket",
+        {"method": "outer_metrics_call", "le": "+Inf"}
+    ) == 1
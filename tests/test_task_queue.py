@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.models.task import TaskCreate, TaskStatus, TaskType
+
+
+@pytest.fixture(autouse=True)
+def unbatched_settings(monkeypatch):
+    monkeypatch.setattr(settings, "batch_task_types", [])
+
+
+async def create_tasks(queue, count: int):
+    """Create `count` email tasks and move them into processing"""
+    for i in range(count):
+        await queue.create_task(TaskCreate(name=f"task-{i}", task_type=TaskType.EMAIL))
+    
+    task_ids = []
+    while True:
+        task_id = await queue.get_next_task()
+        if not task_id:
+            return task_ids
+        task_ids.append(task_id)
+
+
+def test_finish_tasks_writes_each_outcome(queue):
+    async def finish():
+        completed, failed, requeued = await create_tasks(queue, 3)
+        await queue.start_tasks([completed, failed, requeued])
+        await queue.finish_tasks([completed], {failed: "boom"}, [requeued])
+        return (
+            requeued,
+            await queue.get_tasks([completed, failed, requeued]),
+            await queue.redis.smembers(queue.PROCESSING_SET),
+            await queue.redis.zrange(queue.QUEUE_KEY, 0, -1),
+        )
+    
+    requeued, (done, dead, retry), processing, queued = asyncio.run(finish())
+    
+    assert done.status == TaskStatus.COMPLETED
+    assert done.progress == 100
+    assert done.completed_at is not None
+    
+    assert dead.status == TaskStatus.FAILED
+    assert dead.error == "boom"
+    
+    assert retry.status == TaskStatus.RETRYING
+    assert retry.retry_count == 1
+    assert queued == [requeued]
+    
+    assert processing == set()
+
+
+def test_start_tasks_releases_missing_tasks(queue):
+    async def start():
+        task_id, = await create_tasks(queue, 1)
+        await queue.redis.delete(f"{queue.TASK_PREFIX}{task_id}")
+        tasks = await queue.start_tasks([task_id])
+        return tasks, await queue.redis.smembers(queue.PROCESSING_SET)
+    
+    tasks, processing = asyncio.run(start())
+    
+    assert tasks == []
+    assert processing == set()
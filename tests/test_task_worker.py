@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.models.task import TaskCreate, TaskStatus, TaskType
+from app.workers.task_worker import TaskWorker
+
+
+class FailingWorker(TaskWorker):
+    """Worker whose batch handler fails every task"""
+    
+    async def execute_batch(self, task_type, tasks):
+        return {task.task_id: "boom" for task in tasks}
+
+
+class SilentWorker(TaskWorker):
+    """Worker whose batch handler returns no result for any task"""
+    
+    async def execute_batch(self, task_type, tasks):
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def batch_settings(monkeypatch):
+    monkeypatch.setattr(settings, "batch_task_types", [TaskType.EMAIL])
+    monkeypatch.setattr(settings, "batch_wait_ms", 0)
+    monkeypatch.setattr(settings, "max_retries", 1)
+
+
+def test_batch_retries_until_max_retries_then_fails(queue):
+    async def run():
+        task = await queue.create_task(TaskCreate(name="task", task_type=TaskType.EMAIL))
+        worker = FailingWorker(0)
+        
+        await worker.process_next_batch(TaskType.EMAIL)
+        retried = await queue.get_task(task.task_id)
+        
+        await worker.process_next_batch(TaskType.EMAIL)
+        failed = await queue.get_task(task.task_id)
+        
+        return retried, failed, await queue.redis.zcard(queue.get_queue_key(TaskType.EMAIL))
+    
+    retried, failed, queued = asyncio.run(run())
+    
+    assert retried.status == TaskStatus.RETRYING
+    assert retried.retry_count == 1
+    
+    assert failed.status == TaskStatus.FAILED
+    assert failed.error == "boom"
+    assert queued == 0
+
+
+def test_batch_task_without_result_is_not_completed(queue, monkeypatch):
+    monkeypatch.setattr(settings, "max_retries", 0)
+    
+    async def run():
+        task = await queue.create_task(TaskCreate(name="task", task_type=TaskType.EMAIL))
+        await SilentWorker(0).process_next_batch(TaskType.EMAIL)
+        return await queue.get_task(task.task_id)
+    
+    task = asyncio.run(run())
+    
+    assert task.status == TaskStatus.FAILED
+    assert task.error == "No result returned by batch handler"
+
+
+def test_falls_through_to_batched_queue_when_main_queue_is_emptied(queue, monkeypatch):
+    async def run():
+        task = await queue.create_task(TaskCreate(name="task", task_type=TaskType.EMAIL))
+        
+        # The first peek still sees the main queue, which another slot has just emptied
+        peeks = iter([queue.QUEUE_KEY])
+        real_peek = queue.get_next_queue_key
+        
+        async def stale_peek():
+            return next(peeks, None) or await real_peek()
+        
+        monkeypatch.setattr(queue, "get_next_queue_key", stale_peek)
+        
+        processed = await SilentWorker(0).process_next()
+        return processed, await queue.get_task(task.task_id)
+    
+    processed, task = asyncio.run(run())
+    
+    assert processed
+    assert task.status != TaskStatus.PENDING
+
+
+def test_higher_priority_queue_is_served_first(queue):
+    async def run():
+        await queue.create_task(TaskCreate(name="email", task_type=TaskType.EMAIL, priority=1))
+        await queue.create_task(
+            TaskCreate(name="data", task_type=TaskType.DATA_PROCESSING, priority=10)
+        )
+        return await queue.get_next_queue_key()
+    
+    assert asyncio.run(run()) == queue.QUEUE_KEY
@@ -3,18 +3,45 @@ Worker process to handle task execution
 Run this separately from the main FastAPI app
 """
 import asyncio
+from prometheus_client import start_http_server
 from app.workers.task_worker import run_worker
+from app.workers.autoscaler import run_autoscaler
 from app.core.config import settings
+from app.core.task_queue import task_queue
+from app.core.metrics import WORKER_CONCURRENCY
+
+
+async def refresh_metrics():
+    """Periodically refresh queue gauges for the metrics endpoint"""
+    while True:
+        await asyncio.sleep(settings.metrics_refresh_interval)
+        try:
+            await task_queue.update_metrics()
+        except Exception as e:
+            print(f"Metrics refresh error: {str(e)}")
 
 
 async def main():
     """Run multiple workers"""
-    print(f"Starting {settings.workers} workers...")
+    if settings.autoscale:
+        workers = [asyncio.create_task(run_autoscaler())]
+    else:
+        print(f"Starting {settings.workers} workers...")
+        
+        workers = [
+            asyncio.create_task(run_worker(i))
+            for i in range(settings.workers)
+        ]
+        WORKER_CONCURRENCY.set(settings.workers)
     
-    workers = [
-        asyncio.create_task(run_worker(i))
-        for i in range(settings.workers)
-    ]
+    if settings.worker_metrics_port:
+        try:
+            start_http_server(settings.worker_metrics_port)
+            print(f"Metrics available at http://localhost:{settings.worker_metrics_port}/metrics")
+            workers.append(asyncio.create_task(refresh_metrics()))
+        except OSError as e:
+            # Another worker process on this host may already own the port
+            print(f"Metrics server disabled, could not bind port {settings.worker_metrics_port}: {str(e)}")
     
     try:
         await asyncio.gather(*workers)